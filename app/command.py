@@ -1,14 +1,28 @@
 """Define commands."""
 import argparse
-import inspect as ins
-import shutil
+import functools
+import logging
 import sys
-from collections import defaultdict
 
 from . import common
 from . import util
 
 
+_COMMANDS = {}
+
+
+def register_command(cls):
+    """Class decorator that makes a command available on command line."""
+    _COMMANDS[cls.__name__.lower()] = cls
+    return cls
+
+
+def registered_commands():
+    """Return a dict mapping names to all registered command classes."""
+    return dict(_COMMANDS)
+
+
+@register_command
 class Train(common.Command):
     """Command ``train``."""
 
@@ -23,9 +37,13 @@ class Train(common.Command):
 
     def run(self, ws, args):  # pragma: no cover
         logger = ws.logger('train')
-        logger.info('[%s] model: %s, args: %s', ws, ws.build_model(), args)
+        if logger.isEnabledFor(logging.INFO):
+            # skip building the model when the message would be dropped
+            logger.info('[%s] model: %s, args: %s',
+                        ws, ws.build_model(), args)
 
 
+@register_command
 class Test(common.Command):
     """Command ``test``."""
 
@@ -40,9 +58,13 @@ class Test(common.Command):
 
     def run(self, ws, args):  # pragma: no cover
         logger = ws.logger('test')
-        logger.info('[%s] model: %s, args: %s', ws, ws.build_model(), args)
+        if logger.isEnabledFor(logging.INFO):
+            # skip building the model when the message would be dropped
+            logger.info('[%s] model: %s, args: %s',
+                        ws, ws.build_model(), args)
 
 
+@register_command
 class Clean(common.Command):
     """Command ``clean``.
 
@@ -56,12 +78,14 @@ class Clean(common.Command):
                             help='clean the entire workspace')
 
     def run(self, ws, args):
+        import shutil
         if args.all:
             shutil.rmtree(str(ws))
         else:
             shutil.rmtree(str(ws.snapshot_path))
 
 
+@register_command
 class Config(common.Command):
     """Command ``config``,
 
@@ -76,35 +100,35 @@ class Config(common.Command):
 
     def __init__(self, parser):
         super().__init__(parser)
-        subs = parser.add_subparsers(title='models available', dest='model')
+        subs = parser.add_subparsers(title='models available', dest='model',
+                                     action=util.LazySubParsersAction)
         subs.required = True
-        group_options = defaultdict(set)
+        _parser_formatter = argparse.ArgumentDefaultsHelpFormatter
         from . import models as mm
-        _models = [
-            m[0] for m in ins.getmembers(mm,
-                                         util.sub_class_checker(mm.Model))
-            if not m[0].startswith('_')]
-        for model in _models:
-            _parser_formatter = argparse.ArgumentDefaultsHelpFormatter
-            sub = subs.add_parser(model, formatter_class=_parser_formatter)
-            group = sub.add_argument_group('config')
-            Model = getattr(mm, model)
-            Model.add_arguments(group)
-            for action in group._group_actions:
-                group_options[model].add(action.dest)
-
-            def save(args):
-                _model = args.model
-                config = {name: value for (name, value) in args._get_kwargs()
-                          if name in group_options[_model]}
-                Model._unfold_config(config)
-                print('In [%s]: configured %s with %s' %
-                      (args.workspace, _model, str(config)),
-                      file=sys.stderr)
-
-                common.Workspace(args.workspace, _model, config)
-
-            sub.set_defaults(func=save)
+        for model, Model in sorted(mm.registered_models().items()):
+            # model options are only added once the model is selected
+            subs.add_parser(model, formatter_class=_parser_formatter,
+                            build=functools.partial(self._build_parser,
+                                                    Model))
+
+    def _build_parser(self, Model, sub):
+        group = sub.add_argument_group('config')
+        Model.add_arguments(group)
+        opts = frozenset(a.dest for a in group._group_actions)
+
+        # bind per-model values as defaults, not as late-bound closures
+        def save(args, _Model=Model, _opts=opts):
+            _model = args.model
+            config = {name: value for (name, value) in vars(args).items()
+                      if name in _opts}
+            _Model._unfold_config(config)
+            print('In [%s]: configured %s with %s' %
+                  (args.workspace, _model, str(config)),
+                  file=sys.stderr)
+
+            common.Workspace(args.workspace, _model, config)
+
+        sub.set_defaults(func=save)
 
     def run(self, ws, args):
         pass
@@ -1,11 +1,39 @@
 import abc
 import argparse
+import copy
+import io
 import logging
+import os
 import pathlib
 from collections import namedtuple
-from operator import itemgetter
+from types import SimpleNamespace
 
-import toml
+from . import util
+
+# configurations loaded in this process, keyed by absolute path of
+# config.toml, each entry being ``(stat_key, model_cls, config)``
+_CONFIG_CACHE = {}
+
+# config namedtuple classes generated by Model.build, keyed by
+# ``(model_cls, frozenset(field_names))``
+_NT_CACHE = {}
+
+# parsed arguments used by dispatching only, not passed to commands
+_SKIPPED_ARG_NAMES = frozenset({'command', 'func', 'workspace'})
+
+
+def _toml_load(f):
+    # TOML parsers are imported on first use only, preferring the faster
+    # ones where available and falling back to toml otherwise
+    try:
+        from tomllib import load
+    except ImportError:  # pragma: no cover
+        try:
+            from tomli import load
+        except ImportError:
+            from toml import loads
+            return loads(f.read().decode())
+    return load(f)
 
 
 class NotConfiguredError(Exception):
@@ -39,9 +67,14 @@ class Model(abc.ABC):
             >>> print(model.config)
             Config(foo=3)
         """
-        keys, values = zip(*sorted(list(kwargs.items()), key=itemgetter(0)))
-        config = namedtuple(cls.__name__, keys)(*values)
-        return cls(config)
+        # fields are always sorted, so that configs compare equal regardless
+        # of keyword order; only a cache miss pays for sorting
+        key = (cls, frozenset(kwargs))
+        Config = _NT_CACHE.get(key)
+        if Config is None:
+            Config = _NT_CACHE[key] = namedtuple(cls.__name__,
+                                                 sorted(kwargs))
+        return cls(Config(**kwargs))
 
     @classmethod
     def parse(cls, args):
@@ -54,7 +87,8 @@ class Model(abc.ABC):
         parser = _ArgumentParser(prog='', add_help=False)
         cls.add_arguments(parser)
         args = parser.parse_args(args)
-        config = dict(args._get_kwargs())
+        # field order is fixed by build, not by the order of parsed options
+        config = dict(vars(args))
         Model._unfold_config(config)
         return cls.build(**config)
 
@@ -70,20 +104,16 @@ class Model(abc.ABC):
 
     @staticmethod
     def _unfold_config(cfg):
-        for k, v in list(cfg.items()):
-            if isinstance(v, dict):
-                Model._unfold_config(v)
-            if '.' not in k:
-                continue
-            d = cfg
-            for sec in k.split('.')[:-1]:
-                if sec in d:
-                    d = d[sec]
-                else:
-                    d[sec] = {}
-                    d = d[sec]
-            d[k.split('.')[-1]] = v
-            del cfg[k]
+        stack = [cfg]
+        while stack:
+            cur = stack.pop()
+            for k in [k for k in cur if '.' in k]:
+                path = k.split('.')
+                d = cur
+                for sec in path[:-1]:
+                    d = d.setdefault(sec, {})
+                d[path[-1]] = cur.pop(k)
+            stack.extend(v for v in cur.values() if isinstance(v, dict))
 
 
 class Workspace:
@@ -96,6 +126,13 @@ class Workspace:
         self._log_path = self._path / 'log'
         self._snapshot_path = self._path / 'snapshot'
         self._result_path = self._path / 'result'
+        self._config_file = self._path / 'config.toml'
+        self._cache_file = self._path / 'config.toml.cache'
+        # key of this workspace in _CONFIG_CACHE
+        self._config_key = os.path.abspath(str(self._config_file))
+        self._loggers = {}
+        self._handlers = {}
+        self._dirs_ready = set()
 
         if model is None:
             self._model_cls = None
@@ -124,31 +161,30 @@ class Workspace:
     @staticmethod
     def _get_class(name):
         from . import models as mm
-        return getattr(mm, name)
+        return mm.get_model(name)
+
+    def _ensure_dir(self, path):
+        # create each directory at most once per workspace object
+        if path not in self._dirs_ready:
+            path.mkdir(parents=True, exist_ok=True)
+            self._dirs_ready.add(path)
+        return path
 
     @property
     def path(self):
-        if not self._path.exists():
-            self._path.mkdir(parents=True)
-        return self._path
+        return self._ensure_dir(self._path)
 
     @property
     def result_path(self):
-        if not self._result_path.exists():
-            self._result_path.mkdir(parents=True)
-        return self._result_path
+        return self._ensure_dir(self._result_path)
 
     @property
     def snapshot_path(self):
-        if not self._snapshot_path.exists():
-            self._snapshot_path.mkdir(parents=True)
-        return self._snapshot_path
+        return self._ensure_dir(self._snapshot_path)
 
     @property
     def log_path(self):
-        if not self._log_path.exists():
-            self._log_path.mkdir(parents=True)
-        return self._log_path
+        return self._ensure_dir(self._log_path)
 
     @property
     def model_name(self):
@@ -184,39 +220,142 @@ class Workspace:
     def logger(self, name: str):
         """Get a logger that logs to a file.
 
-        Notice that same logger instance is returned for same names.
+        Notice that same logger instance is returned for same names. Records
+        below WARNING are buffered in memory and written in batches of 16,
+        whenever the buffer is full, a warning or error is logged,
+        :meth:`close` is called or the interpreter exits. The buffer is
+        bounded by count only, not by time: up to 15 records may stay in
+        memory for as long as nothing else is logged.
 
         Args:
             name(str): logger name
         """
+        if name in self._loggers:
+            return self._loggers[name]
         logger = logging.getLogger(name)
+        self._loggers[name] = logger
         if logger.handlers:
             # previously configured, remain unchanged
             return logger
         fileFormatter = logging.Formatter('%(levelname)s [%(name)s] '
                                           '%(asctime)s %(message)s',
                                           datefmt='%Y-%m-%d %H:%M:%S')
-        fileHandler = logging.FileHandler(
-            str(self.log_path / (name + '.log')))
+        # delay opening the file, and creating the log directory, until the
+        # first record is emitted
+        fileHandler = util.NonCachingFileHandler(
+            os.path.join(str(self._log_path), name + '.log'), delay=True)
         fileHandler.setFormatter(fileFormatter)
-        logger.addHandler(fileHandler)
+        from logging.handlers import MemoryHandler
+        # keep the buffer small, so that tailing the log stays useful and a
+        # killed process loses few records
+        memHandler = MemoryHandler(
+            16, flushLevel=logging.WARNING, target=fileHandler)
+        logger.addHandler(memHandler)
+        self._handlers[name] = memHandler
         return logger
 
+    def close(self):
+        """Flush buffered log records of loggers got from this workspace and
+        close log files opened by it. Loggers stay usable, log files are
+        opened again on the next record."""
+        for logger in self._loggers.values():
+            # also covers loggers configured before, e.g. by another workspace
+            for handler in logger.handlers:
+                handler.flush()
+        for handler in self._handlers.values():
+            handler.target.close()
+
     def _load(self):
-        """Load configuration."""
+        """Load configuration.
+
+        The parsed configuration is cached as JSON in ``config.toml.cache``,
+        keyed by modification time and size of ``config.toml``, so that the
+        TOML file is only parsed again after it changes. Within one process,
+        loaded configurations are also kept in memory.
+        """
+        # don't create the workspace just to find it is not configured
+        config_file = self._config_file
         try:
-            cfg = toml.load((self.path / 'config.toml').open())
-            self._set_model(cfg['model_name'], cfg[cfg['model_name'].lower()])
+            st = config_file.stat()
+            key = (st.st_mtime_ns, st.st_size)
+            cached = _CONFIG_CACHE.get(self._config_key)
+            if cached is not None and cached[0] == key:
+                # every workspace object gets its own copy to modify
+                self._model_cls = cached[1]
+                self._config = copy.deepcopy(cached[2])
+                return
+            cfg = self._load_cache(key)
+            if cfg is None:
+                with config_file.open('rb') as f:
+                    cfg = _toml_load(f)
+                self._save_cache(key, cfg)
+            name = cfg['model_name']
+            config = cfg[name.lower()]
         except (FileNotFoundError, KeyError):
             raise NotConfiguredError('config.toml doesn\'t exist or '
                                      'is incomplete')
+        try:
+            self._set_model(name, config)
+        except KeyError:
+            raise NotConfiguredError('model %s in config.toml is not '
+                                     'registered' % name)
+        _CONFIG_CACHE[self._config_key] = \
+            (key, self._model_cls, copy.deepcopy(self._config))
 
     def _save(self):
-        """Save configuration."""
-        f = (self.path / 'config.toml').open('w')
-        toml.dump({'model_name': self.model_name,
-                   self.model_name.lower(): self.config}, f)
-        f.close()
+        """Save configuration.
+
+        The configuration is parsed back from the written TOML and put into
+        both caches, so that loading it later doesn't need to parse again.
+        """
+        import toml
+        self._ensure_dir(self._path)
+        config_file = self._config_file
+        data = toml.dumps({'model_name': self.model_name,
+                           self.model_name.lower(): self.config}).encode()
+        with config_file.open('wb') as f:
+            f.write(data)
+        st = config_file.stat()
+        key = (st.st_mtime_ns, st.st_size)
+        cfg = _toml_load(io.BytesIO(data))
+        self._save_cache(key, cfg)
+        _CONFIG_CACHE[self._config_key] = \
+            (key, self._model_cls, cfg[self.model_name.lower()])
+
+    def _load_cache(self, key):
+        """Return cached configuration if it is still valid for ``key``."""
+        import json
+        try:
+            with self._cache_file.open() as f:
+                cached = json.load(f)
+            if cached['key'] == list(key) and isinstance(cached['cfg'], dict):
+                return cached['cfg']
+        except Exception:
+            # missing or broken cache, fall back to parsing
+            pass
+        return None
+
+    def _save_cache(self, key, cfg):
+        """Atomically write parsed configuration to cache."""
+        import json
+        import tempfile
+        try:
+            data = json.dumps({'key': list(key), 'cfg': cfg})
+        except (TypeError, ValueError):
+            # e.g. TOML dates are not JSON, don't touch the disk at all
+            return
+        try:
+            fd, tmp_file = tempfile.mkstemp(prefix='config.toml.cache.',
+                                            dir=str(self._path))
+        except OSError:  # pragma: no cover
+            return
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(data)
+            os.replace(tmp_file, str(self._cache_file))
+        except OSError:  # pragma: no cover
+            # caching is best effort only
+            os.unlink(tmp_file)
 
 
 class Command(abc.ABC):
@@ -227,11 +366,13 @@ class Command(abc.ABC):
 
     def _run(self, args):
         ws = Workspace(args.workspace)
-        cmd = args.command
-        del args.command, args.func, args.workspace
-        args = {name: value for (name, value) in args._get_kwargs()}
-        args = namedtuple(cmd.capitalize(), args.keys())(*args.values())
-        return self.run(ws, args)
+        ns = SimpleNamespace(**vars(args))
+        for name in _SKIPPED_ARG_NAMES:
+            delattr(ns, name)
+        try:
+            return self.run(ws, ns)
+        finally:
+            ws.close()
 
     @abc.abstractmethod
     def run(self, ws, args):
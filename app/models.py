@@ -1,11 +1,36 @@
 """
-Model classes that defines model parameters and architecture.
+Model classes that defines model parameters and architecture. Models are
+made available to the ``config`` command with :func:`register_model`.
 """
 
 from .common import Model
 from .util import wrap_parser
 
+_MODELS = {}
 
+
+def register_model(cls):
+    """Class decorator that makes a model available to ``config`` and to
+    workspaces loading it from ``config.toml``."""
+    _MODELS[cls.__name__] = cls
+    return cls
+
+
+def get_model(name):
+    """Get a registered model class by name.
+
+    Raises:
+        KeyError: if no model is registered with this name
+    """
+    return _MODELS[name]
+
+
+def registered_models():
+    """Return a dict mapping names to all registered model classes."""
+    return dict(_MODELS)
+
+
+@register_model
 class Simple(Model):
     """A toy class to demonstrate how to add model arguments."""
 
@@ -14,6 +39,7 @@ class Simple(Model):
         parser.add_argument('-foo', default=10, type=int)
 
 
+@register_model
 class Trainer(Model):
     """A toy class to demonstrate how to put models together."""
 
@@ -4,9 +4,10 @@ Main program parsing arguments and running commands.
 from __future__ import print_function
 
 import argparse
-import inspect as ins
+import functools
 import logging
 import sys
+import traceback
 
 from . import command
 from . import common
@@ -29,19 +30,20 @@ main_parser.add_argument('-w', '--workspace',
 main_parser.add_argument('-q', action='store_true', help='quiet')
 main_parser.add_argument('-v', action='store_true', help='verbose')
 _subparsers = main_parser.add_subparsers(title='supported commands',
-                                         dest='command')
+                                         dest='command',
+                                         action=util.LazySubParsersAction)
 _subparsers.required = True
-_subparser_map = {}
 
-_commands = {m[0].lower(): m[1]
-             for m in ins.getmembers(command,
-                                     util.sub_class_checker(common.Command))}
 
-for _cmd in _commands:
-    _sub = _subparsers.add_parser(_cmd,
-                                  formatter_class=_parser_formatter)
-    _subparser_map[_cmd] = _sub
-    _sub.set_defaults(func=_commands[_cmd](_sub)._run)
+def _build_command(cls, sub):
+    sub.set_defaults(func=cls(sub)._run)
+
+
+# commands are only instantiated once selected on command line
+for _cmd, _cls in sorted(command.registered_commands().items()):
+    _subparsers.add_parser(
+        _cmd, formatter_class=_parser_formatter,
+        build=functools.partial(_build_command, _cls))
 
 
 def main(args):
@@ -50,16 +52,14 @@ def main(args):
         return args.func(args)
     except KeyboardInterrupt:  # pragma: no cover
         # print traceback info to screen only
-        import traceback
         sys.stderr.write(traceback.format_exc())
         logger.warning('cancelled by user')
     except common.NotConfiguredError as e:  # pragma: no cover
         print('error:', e)
-        _subparser_map['config'].print_usage()
+        _subparsers.get_parser('config').print_usage()
         sys.exit(1)
     except Exception as e:  # pragma: no cover
         # print traceback info to screen only
-        import traceback
         sys.stderr.write(traceback.format_exc())
         logger.error('exception occurred: %s', e)
 
@@ -84,13 +84,22 @@ if __name__ == '__main__':
             'CRITICAL': 'y',
             'ERROR': 'r'
         }
+        _LEVEL_NAMES = {level: util.colored(level[0], color)
+                        for level, color in _LOG_COLORS.items()}
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            # bind base method once instead of looking it up per record
+            self._super_format = super().format
 
         def format(self, record):
-            levelname = record.levelname
-            if levelname in self._LOG_COLORS:
-                record.levelname = util.colored(
-                    record.levelname[0], self._LOG_COLORS[record.levelname])
-            return logging.Formatter.format(self, record)
+            # restore level name, as other handlers may format the same record
+            orig = record.levelname
+            record.levelname = self._LEVEL_NAMES.get(orig, orig)
+            try:
+                return self._super_format(record)
+            finally:
+                record.levelname = orig
 
     logFormatter = _ColoredFormatter(
         '%(levelname)s [%(name)s] %(asctime)s %(message)s',
@@ -1,26 +1,144 @@
-import inspect as ins
-import re
+import argparse
+import logging
+import os
+import sys
+
+# colors are only emitted to a terminal, and never if NO_COLOR is set
+_USE_COLOR = (sys.stderr is not None and sys.stderr.isatty() and
+              not os.environ.get('NO_COLOR'))
 
 
 def wrap_parser(namespace, parser):  # pragma: no cover
     """Wraps an argument parser, putting all following options under a
     namespace. """
-    robj = re.compile(r'^(-+)')
+    def _prefix(s):
+        # insert namespace right after the leading dashes
+        i = len(s) - len(s.lstrip('-'))
+        return s[:i] + namespace + '.' + s[i:] if i else s
 
     class _Wrapper:
         def __init__(self, _parser):
             self.parser = _parser
 
         def add_argument(self, *args, **kwargs):
-            args = [robj.sub(r'\1' + namespace + '.', s) for s in args]
+            args = [_prefix(s) for s in args]
             self.parser.add_argument(*args, **kwargs)
 
     return _Wrapper(parser)
 
 
+class NonCachingFileHandler(logging.FileHandler):
+    """File handler that advises the kernel not to keep the log file in page
+    cache, so that logs of long-running jobs don't bloat it.
+
+    The advice covers the whole file and is given once every
+    :attr:`advise_every` records and on :meth:`close`, rather than per
+    record: pages still dirty at that time are dropped by a later call,
+    once they have been written back.
+    """
+
+    advise_every = 1024
+
+    def __init__(self, *args, **kwargs):
+        self._unadvised = 0
+        super().__init__(*args, **kwargs)
+
+    def emit(self, record):
+        super().emit(record)
+        self._unadvised += 1
+        if self._unadvised >= self.advise_every:
+            self._advise()
+
+    def close(self):
+        self._advise()
+        super().close()
+
+    def _open(self):
+        # with delay=True, the directory is only created once there is
+        # something to log
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+    def _advise(self):
+        self._unadvised = 0
+        if self.stream is not None and hasattr(os, 'posix_fadvise'):
+            try:
+                os.posix_fadvise(self.stream.fileno(), 0, 0,
+                                 os.POSIX_FADV_DONTNEED)
+            except (OSError, ValueError):  # pragma: no cover
+                # only a hint, not all file systems support it
+                pass
+
+
+class LazySubParsersAction(argparse._SubParsersAction):
+    """Subparsers action that populates subparsers only when selected.
+
+    Pass a ``build`` callback to :meth:`add_parser`, which is called with the
+    new subparser right before it is first used, so that arguments of
+    subparsers never selected on command line are not set up at all.
+
+    Example:
+        >>> parser = argparse.ArgumentParser()
+        >>> subs = parser.add_subparsers(action=LazySubParsersAction)
+        >>> _ = subs.add_parser(
+        ...     'foo', build=lambda p: p.add_argument('-x', type=int))
+        >>> parser.parse_args(['foo', '-x', '1'])
+        Namespace(x=1)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._builders = {}
+
+    def add_parser(self, name, build=None, **kwargs):
+        parser = super().add_parser(name, **kwargs)
+        if build is not None:
+            # keyed by parser, so that aliases share the same builder
+            self._builders[parser] = build
+        return parser
+
+    def get_parser(self, name):
+        """Get subparser by name or alias, populating it first if needed."""
+        parser = self._name_parser_map[name]
+        build = self._builders.pop(parser, None)
+        if build is not None:
+            build(parser)
+        return parser
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        if values[0] in self._name_parser_map:
+            self.get_parser(values[0])
+        super().__call__(parser, namespace, values, option_string)
+
+
+_COLOR_CODES = {
+    'k': 0,  # black
+    'r': 1,  # red
+    'g': 2,  # green
+    'y': 3,  # yellow
+    'b': 4,  # blue
+    'm': 5,  # magenta
+    'c': 6,  # cyan
+    'w': 7   # white
+}
+
+_FMT_CODES = {
+    'b': 1,  # bold
+    'f': 2,  # faint
+    'i': 3,  # italic
+    'u': 4,  # underline
+    'x': 5,  # blinking
+    'y': 6,  # fast blinking
+    'r': 7,  # reverse
+    'h': 8,  # hide
+    's': 9,  # strike through
+}
+
+
 def colored(fmt, fg=None, bg=None, style=None):
     """
-    Return colored string.
+    Return colored string. The string is returned unchanged if stderr is not
+    a terminal or environment variable ``NO_COLOR`` is set.
 
     List of colours (for fg and bg):
         k   black
@@ -49,38 +167,17 @@ def colored(fmt, fg=None, bg=None, style=None):
         bg (str): background color
         style (str): text style
     """
-
-    colcode = {
-        'k': 0,  # black
-        'r': 1,  # red
-        'g': 2,  # green
-        'y': 3,  # yellow
-        'b': 4,  # blue
-        'm': 5,  # magenta
-        'c': 6,  # cyan
-        'w': 7   # white
-    }
-
-    fmtcode = {
-        'b': 1,  # bold
-        'f': 2,  # faint
-        'i': 3,  # italic
-        'u': 4,  # underline
-        'x': 5,  # blinking
-        'y': 6,  # fast blinking
-        'r': 7,  # reverse
-        'h': 8,  # hide
-        's': 9,  # strike through
-    }
+    if not _USE_COLOR:
+        return fmt
 
     # properties
     props = []
     if isinstance(style, str):
-        props = [fmtcode[s] for s in style]
+        props = [_FMT_CODES[s] for s in style]
     if isinstance(fg, str):
-        props.append(30 + colcode[fg])
+        props.append(30 + _COLOR_CODES[fg])
     if isinstance(bg, str):
-        props.append(40 + colcode[bg])
+        props.append(40 + _COLOR_CODES[bg])
 
     # display
     props = ';'.join([str(x) for x in props])
@@ -88,14 +185,3 @@ def colored(fmt, fg=None, bg=None, style=None):
         return '\x1b[%sm%s\x1b[0m' % (props, fmt)
     else:
         return fmt
-
-
-def sub_class_checker(cls):
-    def rv(obj):
-        if ins.isclass(obj) and not ins.isabstract(obj) \
-                and issubclass(obj, cls):
-            return True
-        else:
-            return False
-
-    return rv
@@ -1,10 +1,16 @@
+import json
+import logging
+
 import py
 import pytest
 
 import app.common as common
+import app.models
 
 
-class ModelTest(common.Model):
+# named apart from the model in test_run, which is registered as well
+@app.models.register_model
+class CommonModelTest(common.Model):
     @classmethod
     def add_arguments(cls, parser):
         parser.add_argument('-x', type=int, required=True)
@@ -12,12 +18,13 @@ class ModelTest(common.Model):
 
 
 def test_model():
-    model1 = ModelTest.parse(['-x', '10'])
-    model2 = ModelTest.build(x=10, y=10)
+    model1 = CommonModelTest.parse(['-x', '10'])
+    model2 = CommonModelTest.build(x=10, y=10)
     assert model1.config == model2.config
+    assert type(model1.config) is type(model2.config)
 
     with pytest.raises(common.ParseError) as e:
-        ModelTest.parse([])
+        CommonModelTest.parse([])
 
     assert str(e.value) == 'the following arguments are required: -x'
 
@@ -27,7 +34,8 @@ def test_model():
 
 
 def test_workspace(tmpdir: py.path.local):
-    ws = common.Workspace(str(tmpdir.join('ws')), ModelTest, {'x': 3, 'y': 4})
+    ws = common.Workspace(str(tmpdir.join('ws')), CommonModelTest,
+                          {'x': 3, 'y': 4})
     assert str(ws.log_path) == str(tmpdir.join('ws/log'))
     assert str(ws.result_path) == str(tmpdir.join('ws/result'))
     assert str(ws.snapshot_path) == str(tmpdir.join('ws/snapshot'))
@@ -41,11 +49,74 @@ def test_workspace(tmpdir: py.path.local):
     logger.error('test log 2')
     assert len(list((ws.log_path / 'test.log').open())) == 2
 
+    # records below WARNING are buffered until flushed
+    logger.setLevel(logging.INFO)
+    logger.info('test log 3')
+    assert len(list((ws.log_path / 'test.log').open())) == 2
+    ws.close()
+    assert len(list((ws.log_path / 'test.log').open())) == 3
+    for i in range(16):
+        logger.info('test log %d', i + 4)
+    assert len(list((ws.log_path / 'test.log').open())) == 19
+    logger.warning('test log 20')
+    assert len(list((ws.log_path / 'test.log').open())) == 20
+    ws.close()
+
+    # loggers configured by another workspace are flushed as well
+    ws_other = common.Workspace(str(tmpdir.join('ws')))
+    assert ws_other.logger('test') is logger
+    logger.info('test log 21')
+    ws_other.close()
+    assert len(list((ws.log_path / 'test.log').open())) == 21
+    logger.setLevel(logging.NOTSET)
+
+    ws = common.Workspace(str(tmpdir.join('ws')))
+    assert ws.config == {'x': 3, 'y': 4}
+    assert tmpdir.join('ws/config.toml.cache').check(file=1)
+    assert str(tmpdir.join('ws/config.toml')) in common._CONFIG_CACHE
+
+    # cached configurations are not shared between workspace objects
+    ws.config['x'] = 99
+    assert common.Workspace(str(tmpdir.join('ws'))).config == {'x': 3, 'y': 4}
+
+    # a broken cache is ignored and replaced
+    for content in ['{', '[]', '{"key": [0, 0], "cfg": {}}',
+                    '{"key": null, "cfg": 1}']:
+        tmpdir.join('ws/config.toml.cache').write(content)
+        common._CONFIG_CACHE.clear()
+        ws = common.Workspace(str(tmpdir.join('ws')))
+        assert ws.config == {'x': 3, 'y': 4}
+    assert json.loads(tmpdir.join('ws/config.toml.cache').read())['cfg'] == \
+        {'model_name': 'CommonModelTest', 'commonmodeltest': {'x': 3, 'y': 4}}
+
+    # parsed configuration is served from cache until config.toml changes
     ws = common.Workspace(str(tmpdir.join('ws')))
     assert ws.config == {'x': 3, 'y': 4}
+    common.Workspace(str(tmpdir.join('ws')), CommonModelTest, {'x': 5, 'y': 4})
+    assert tmpdir.join('ws/config.toml.cache').check(file=1)
+    common._CONFIG_CACHE.clear()
+    ws = common.Workspace(str(tmpdir.join('ws')))
+    assert ws.config == {'x': 5, 'y': 4}
+    ws = common.Workspace(str(tmpdir.join('ws')), CommonModelTest,
+                          {'x': 3, 'y': 4})
 
     ws2 = common.Workspace(str(tmpdir.join('ws2')))
     ws2.setup_like(ws.build_model())
-    assert str(ws2.build_model()) == 'ModelTest(x=3, y=4)'
+    assert str(ws2.build_model()) == 'CommonModelTest(x=3, y=4)'
+
+    _ = common.Workspace(str(tmpdir.join('ws3')), CommonModelTest)
+
+    # configurations that can't be stored as JSON are not cached on disk
+    tmpdir.join('ws5/config.toml').write('model_name = "CommonModelTest"\n'
+                                         '[commonmodeltest]\n'
+                                         'x = 1979-05-27\n', ensure=True)
+    common._CONFIG_CACHE.clear()
+    assert common.Workspace(str(tmpdir.join('ws5'))).config['x'].year == 1979
+    assert tmpdir.join('ws5').listdir() == [tmpdir.join('ws5/config.toml')]
 
-    _ = common.Workspace(str(tmpdir.join('ws3')), ModelTest)
+    # models are resolved through the registry only
+    tmpdir.join('ws4/config.toml').write('model_name = "Unknown"\n'
+                                         '[unknown]\n', ensure=True)
+    with pytest.raises(common.NotConfiguredError) as e:
+        _ = common.Workspace(str(tmpdir.join('ws4'))).config
+    assert str(e.value) == 'model Unknown in config.toml is not registered'
@@ -7,3 +7,13 @@ def test_models():
     assert trainer.config.lr == 0.1
     assert trainer.l1.config.foo == 3
     assert trainer.l2.config.foo == 4
+
+
+def test_config_order():
+    # config fields are sorted regardless of keyword order
+    assert models.Trainer.build(lr=0.1, l2={'foo': 1}, l1={'foo': 2}).config \
+        == models.Trainer.build(l1={'foo': 2}, lr=0.1, l2={'foo': 1}).config
+    trainer = models.Trainer.parse(['-lr', '0.5'])
+    assert trainer.config._fields == ('l1', 'l2', 'lr')
+    assert type(trainer.config) is \
+        type(models.Trainer.build(lr=0.5, l1={}, l2={}).config)
@@ -1,3 +1,6 @@
+import importlib
+import logging
+
 import py
 import pytest
 from _pytest.capture import CaptureFixture
@@ -20,12 +23,13 @@ def dummy(self, ws, args):
 
 
 # insert model and command for testing
-app.models.ModelTest = ModelTest
+_train_run = app.command.Train.run
+app.models.register_model(ModelTest)
 app.command.Train.run = dummy
 app.command.Test.run = dummy
 
 
-def test_main(tmpdir: py.path.local, capsys: CaptureFixture):
+def test_main(tmpdir: py.path.local, capsys: CaptureFixture, monkeypatch):
     """Test main workflow."""
 
     # temporary workspace
@@ -34,13 +38,19 @@ def test_main(tmpdir: py.path.local, capsys: CaptureFixture):
 
     import app.run
 
-    # error if workspace command called before config
-    with pytest.raises(app.common.NotConfiguredError):
+    # error if workspace command called before config, which leaves no
+    # empty workspace behind
+    monkeypatch.setattr(app.command.Train, 'run', _train_run)
+    logging.getLogger('train').setLevel(logging.INFO)
+    with pytest.raises(SystemExit) as e:
         args = app.run.main_parser.parse_args(
             ['-w', ws_path, 'train']
         )
-        w, _ = app.run.main(args)
-        w.build_model()
+        app.run.main(args)
+    assert e.value.code == 1
+    assert not ws.exists()
+    logging.getLogger('train').setLevel(logging.NOTSET)
+    monkeypatch.undo()
 
     # test config
     args = app.run.main_parser.parse_args(
@@ -97,7 +107,5 @@ def test_main(tmpdir: py.path.local, capsys: CaptureFixture):
     assert capsys.readouterr().err.strip().startswith('usage:')
 
     # reset logging state as app.run.main messed up with it
-    import logging
-    import importlib
     logging.shutdown()
     importlib.reload(logging)
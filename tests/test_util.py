@@ -1,7 +1,13 @@
+import argparse
+import logging
+
+import py
+
 import app.util
 
 
-def test_colored():
+def test_colored(monkeypatch):
+    monkeypatch.setattr(app.util, '_USE_COLOR', True)
     # test colored output w/o bold font
     assert app.util.colored('hello') == 'hello'
     assert app.util.colored('hello', 'r') == \
@@ -10,3 +16,48 @@ def test_colored():
         '\x1b[1;31;44mhello\x1b[0m'
     assert app.util.colored('hello', 'r', style='b') == \
         '\x1b[1;31mhello\x1b[0m'
+
+    # no colors when not writing to a terminal
+    monkeypatch.setattr(app.util, '_USE_COLOR', False)
+    assert app.util.colored('hello', 'r', style='b') == 'hello'
+
+
+def test_non_caching_file_handler(tmpdir: py.path.local, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app.util.os, 'posix_fadvise',
+                        lambda *args: calls.append(args), raising=False)
+    monkeypatch.setattr(app.util.os, 'POSIX_FADV_DONTNEED', 4, raising=False)
+
+    handler = app.util.NonCachingFileHandler(str(tmpdir.join('test.log')),
+                                             delay=True)
+    handler.advise_every = 2
+    assert calls == []
+    for i in range(3):
+        handler.emit(logging.makeLogRecord({'msg': 'test log'}))
+    assert calls == [(handler.stream.fileno(), 0, 0, 4)]
+    handler.close()
+    assert len(calls) == 2
+    assert tmpdir.join('test.log').read() == 'test log\n' * 3
+
+
+def test_lazy_subparsers():
+    built = []
+
+    def build(p):
+        built.append(p.prog)
+        p.add_argument('-x', type=int)
+
+    parser = argparse.ArgumentParser(prog='test')
+    subs = parser.add_subparsers(action=app.util.LazySubParsersAction)
+    subs.add_parser('foo', build=build)
+    subs.add_parser('bar', aliases=['b'], build=build)
+    assert built == []
+
+    assert parser.parse_args(['foo', '-x', '1']).x == 1
+    assert parser.parse_args(['foo', '-x', '2']).x == 2
+    assert built == ['test foo']
+
+    # subparsers selected by alias are populated as well, only once
+    assert parser.parse_args(['b', '-x', '3']).x == 3
+    assert parser.parse_args(['bar', '-x', '4']).x == 4
+    assert built == ['test foo', 'test bar']